@@ -1,106 +1,223 @@
 import os
 import sys
-from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
-EXCLUDED_DIRS = {
+EXCLUDED_DIRS = frozenset({
     'node_modules',
     'venv',
     '.git',
     '__pycache__',
     'build',
     'dist'
-}
+})
 
-EXCLUDED_FILES = {
+EXCLUDED_FILES = frozenset({
     'package-lock.json',
     'yarn.lock',
     'project-context.txt'
-}
+})
 
-TEXT_EXTENSIONS = {
+TEXT_EXTENSIONS = frozenset({
     '.txt', '.md', '.py', '.js', '.ts', '.jsx', '.tsx', '.cpp', '.h', 
     '.hpp', '.c', '.cs', '.java', '.html', '.css', '.scss', '.sass',
     '.json', '.yml', '.yaml', '.xml', '.env', '.config', '.dockerfile',
     '.sh', '.bat', '.ps1'
-}
+})
 
-EXCLUDED_EXTENSIONS = {
+EXCLUDED_EXTENSIONS = frozenset({
     '.svg', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.pdf', '.zip',
     '.tar', '.gz', '.rar', '.exe', '.dll', '.pdb', '.pyc'
-}
+})
 
-def get_script_name():
-    """Returns the name of the currently executing script."""
-    return os.path.basename(sys.argv[0]) if sys.argv[0].endswith('.py') else os.path.basename(__file__)
+# I/O buffer sizes; output is flushed to disk in chunks of at least the write size
+_READ_BUFFER_SIZE = 1 << 17
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Worker threads used to read files concurrently, and how many files may be
+# read ahead of the output writer
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_READ_AHEAD = _MAX_WORKERS * 2
+
+# Raw read-only open without buffered file objects (O_BINARY only exists on Windows)
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+# Byte sets deleted by estimate_tokens
+_ASCII_ALNUM_SPACE = bytes(c for c in range(128) if chr(c).isalnum() or chr(c).isspace())
+_ASCII_ALL = bytes(range(128))
+
+# Output is truncated and rewritten on every run
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+# Name of the currently executing script, resolved once at import
+_SCRIPT_NAME = os.path.basename(sys.argv[0]) if sys.argv[0].endswith('.py') else os.path.basename(__file__)
+
+def detect_encoding(raw):
+    """Detects file encoding by checking the leading bytes for BOM markers."""
+    if raw.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if raw.startswith(b'\xff\xfe') or raw.startswith(b'\xfe\xff'):
+        return 'utf-16'
+    if raw.startswith(b'\xff\xfe\x00\x00') or raw.startswith(b'\x00\x00\xfe\xff'):
+        return 'utf-32'
+    return 'utf-8'
 
 def is_text_file(file_path):
-    """Checks if a file is a text file by looking for null bytes."""
+    """Checks if a file is a text file by looking for null bytes in its first 1024 bytes."""
     try:
-        with open(file_path, 'rb') as file:
-            chunk = file.read(1024)
-            return b'\0' not in chunk
+        fd = os.open(file_path, _OPEN_FLAGS)
+        try:
+            chunk = os.read(fd, 1024)
+        finally:
+            os.close(fd)
     except Exception:
         return False
+    return b'\0' not in chunk
+
+def read_file_bytes(file_path):
+    """Reads a whole file through a raw descriptor."""
+    fd = os.open(file_path, _OPEN_FLAGS)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, _READ_BUFFER_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+def decode_text(data, encoding):
+    """Decodes file bytes, matching the newline translation of text-mode reads.
+    
+    Files without a BOM are decoded as UTF-8 with invalid bytes replaced,
+    so a stray byte no longer drops the whole file.
+    """
+    text = data.decode(encoding, 'replace' if encoding == 'utf-8' else 'strict')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
 
-def get_file_encoding(file_path):
-    """Detects file encoding by checking for BOM markers."""
-    with open(file_path, 'rb') as file:
-        raw = file.read(4)
-        if raw.startswith(b'\xef\xbb\xbf'):
-            return 'utf-8-sig'
-        if raw.startswith(b'\xff\xfe') or raw.startswith(b'\xfe\xff'):
-            return 'utf-16'
-        if raw.startswith(b'\xff\xfe\x00\x00') or raw.startswith(b'\x00\x00\xfe\xff'):
-            return 'utf-32'
-        return 'utf-8'
-
-def estimate_tokens(text):
-    """Rough estimation of token count based on word count + special characters."""
+def estimate_tokens(text, raw=None):
+    """Rough estimation of token count based on word count + special characters.
+    
+    raw may be the UTF-8 bytes the text was decoded from, which saves
+    encoding the text again.
+    """
     words = len(text.split())
-    special_chars = len([c for c in text if not c.isalnum() and not c.isspace()])
+    if raw is None:
+        raw = text.encode('utf-8', 'surrogatepass')
+    # Delete ASCII letters, digits and whitespace at the byte level; the remaining
+    # ASCII bytes are special characters and only non-ASCII leftovers need checking
+    rest = raw.translate(None, _ASCII_ALNUM_SPACE)
+    non_ascii = rest.translate(None, _ASCII_ALL)
+    special_chars = len(rest) - len(non_ascii)
+    if non_ascii:
+        special_chars += len([c for c in non_ascii.decode('utf-8', 'surrogatepass')
+                              if not c.isalnum() and not c.isspace()])
     return words + special_chars + (words // 4)
 
-def should_process_file(file_path):
-    """Determines if a file should be processed based on configuration."""
-    path = Path(file_path)
-    
-    if path.name == get_script_name():
+def should_process_file(name):
+    """Determines if a file should be processed based on its name and extension."""
+    if name == _SCRIPT_NAME:
         return False
         
-    if path.name in EXCLUDED_FILES:
+    if name in EXCLUDED_FILES:
         return False
-    if path.suffix.lower() in EXCLUDED_EXTENSIONS:
+    # Same rule as Path.suffix: no extension for dotfiles or names ending in a dot
+    dot = name.rfind('.')
+    ext = name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+    if ext in EXCLUDED_EXTENSIONS:
         return False
-    if not (path.suffix.lower() in TEXT_EXTENSIONS or path.suffix == ''):
+    if ext and ext not in TEXT_EXTENSIONS:
         return False
     
-    return is_text_file(file_path)
+    return True
 
-def generate_tree(start_path, output_file, prefix=""):
-    """Generates a directory tree structure."""
-    if os.path.basename(start_path) in EXCLUDED_DIRS:
-        return
+def walk_directory(start_path, tree_lines, files):
+    """Walks the project once, collecting tree lines and candidate files.
+    
+    File lines carry the index of their entry in files so they can be
+    dropped from the tree once the file turns out to be binary.
+    """
+    # Depth-first with an explicit stack of (path, name, prefix, is_dir). Excluded
+    # subdirectories are never pushed; the start directory is always walked, even
+    # if its name is excluded, since it was requested explicitly
+    stack = [(start_path, os.path.basename(start_path), "", True)]
+    
+    while stack:
+        path, name, prefix, is_dir = stack.pop()
+        
+        if not is_dir:
+            tree_lines.append((f"{prefix}{name}\n", len(files)))
+            files.append(path)
+            continue
 
-    output_file.write(f"{prefix}{os.path.basename(start_path)}/\n")
+        tree_lines.append((f"{prefix}{name}/\n", None))
+        
+        # Symlinks are never followed as directories, which also rules out
+        # cycles; symlinked files are still read when opened
+        try:
+            with os.scandir(path) as it:
+                # Decorate once so sorting compares plain tuples: directories first,
+                # then case-insensitive names with the exact name breaking ties
+                items = [(not entry.is_dir(follow_symlinks=False), entry.name.lower(), entry.name, entry)
+                         for entry in it]
+        except PermissionError:
+            tree_lines.append((f"{prefix}[ACCESS DENIED]\n", None))
+            continue
+        items.sort()
+        
+        children = []
+        last = len(items) - 1
+        for i, (is_file, _, item_name, item) in enumerate(items):
+            is_last = i == last
+            
+            if not is_file:
+                if item_name not in EXCLUDED_DIRS:
+                    children.append((item.path, item_name, prefix + ("   " if is_last else "│  "), True))
+            elif should_process_file(item_name):
+                children.append((item.path, item_name, prefix + ("└─ " if is_last else "├─ "), False))
+        
+        # Reversed so the first child is popped, and fully walked, first
+        stack.extend(reversed(children))
+
+def read_file_stats(file_path):
+    """Reads a file and computes its statistics.
     
+    Returns a tuple of (content, error, lines, tokens).
+    """
     try:
-        items = sorted(os.scandir(start_path), key=lambda x: (not x.is_dir(), x.name.lower()))
-    except PermissionError:
-        output_file.write(f"{prefix}[ACCESS DENIED]\n")
-        return
+        data = read_file_bytes(file_path)
+        encoding = detect_encoding(data[:4])
+        content = decode_text(data, encoding)
+    except Exception as e:
+        return None, e, 0, 0
     
-    for i, item in enumerate(items):
-        is_last = i == len(items) - 1
-        current_prefix = prefix + ("└─ " if is_last else "├─ ")
-        next_prefix = prefix + ("   " if is_last else "│  ")
-        
-        if item.is_dir():
-            if item.name not in EXCLUDED_DIRS:
-                generate_tree(item.path, output_file, next_prefix)
-        else:
-            if should_process_file(item.path):
-                output_file.write(f"{current_prefix}{item.name}\n")
+    # Valid UTF-8 bytes differ from the text only in carriage returns, which the
+    # token estimate ignores as whitespace, so they can be scanned directly
+    raw = data if encoding == 'utf-8' and '\ufffd' not in content else None
+    
+    # UTF-8 decoding keeps every newline byte, so unless carriage returns were
+    # translated the lines can be counted on the smaller byte buffer
+    if encoding.startswith('utf-8') and b'\r' not in data:
+        lines = data.count(b'\n') + 1
+    else:
+        lines = content.count('\n') + 1
+    return content, None, lines, estimate_tokens(content, raw)
+
+def read_ahead(executor, func, items):
+    """Maps func over items on executor in order, with at most _READ_AHEAD calls in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= _READ_AHEAD:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 def process_directory(start_path, output_path, base_dir):
     """Main function for processing the project directory."""
@@ -108,45 +225,77 @@ def process_directory(start_path, output_path, base_dir):
     total_tokens = 0
     file_count = 0
     
-    with open(output_path, 'w', encoding='utf-8') as output_file:
-        output_file.write("<project_overview>\n")
-        output_file.write(f"<generated_at>{os.path.basename(start_path)}</generated_at>\n\n")
+    # Single traversal: the tree is buffered and the file list reused for contents
+    tree_lines = []
+    files = []
+    walk_directory(start_path, tree_lines, files)
+    
+    # Reading is I/O bound, so it is overlapped across threads: the tree only
+    # needs the binary check, and contents are read a bounded window ahead of
+    # the writer so memory does not grow with the size of the project
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        # Output is encoded into a byte buffer that is flushed to a raw descriptor
+        # whenever it exceeds _WRITE_BUFFER_SIZE
+        out_fd = os.open(output_path, _WRITE_FLAGS, 0o644)
+        buffer = bytearray()
         
-        output_file.write("<directory_structure>\n")
-        generate_tree(start_path, output_file)
-        output_file.write("</directory_structure>\n\n")
+        def flush():
+            while buffer:
+                del buffer[:os.write(out_fd, buffer)]
         
-        output_file.write("<file_contents>\n")
+        def emit(text):
+            # Keep the platform newline translation of text-mode files
+            if os.linesep != '\n':
+                text = text.replace('\n', os.linesep)
+            buffer.extend(text.encode('utf-8'))
+            if len(buffer) >= _WRITE_BUFFER_SIZE:
+                flush()
         
-        for root, dirs, files in os.walk(start_path):
-            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        try:
+            is_text = list(executor.map(is_text_file, files))
+            text_files = [file_path for file_path, text in zip(files, is_text) if text]
+            
+            emit("<project_overview>\n"
+                 f"<generated_at>{os.path.basename(start_path)}</generated_at>\n\n"
+                 "<directory_structure>\n")
+            emit(''.join([line for line, index in tree_lines
+                          if index is None or is_text[index]]))
+            emit("</directory_structure>\n\n"
+                 "<file_contents>\n")
             
-            for file in sorted(files, key=str.lower):
-                file_path = os.path.join(root, file)
+            # Entry paths all extend start_path, so relative paths only need the
+            # start directory resolved once and the walked suffix appended. A
+            # start outside base_dir may lead back into it, so those paths are
+            # still resolved one by one to keep them as short as relpath makes them
+            start_prefix_len = len(os.path.join(start_path, ''))
+            rel_root = os.path.relpath(start_path, base_dir)
+            rel_prefix = '' if rel_root == os.curdir else os.path.join(rel_root, '')
+            outside_base = rel_root == os.pardir or rel_root.startswith(os.path.join(os.pardir, ''))
+            
+            for file_path, result in zip(text_files, read_ahead(executor, read_file_stats, text_files)):
+                content, error, lines, tokens = result
+                
+                # Use relative path from the base directory
+                if outside_base:
+                    rel_path = os.path.relpath(file_path, base_dir)
+                else:
+                    rel_path = rel_prefix + file_path[start_prefix_len:]
                 
-                if should_process_file(file_path):
-                    try:
-                        encoding = get_file_encoding(file_path)
-                        with open(file_path, 'r', encoding=encoding) as f:
-                            content = f.read()
-                            
-                        # Use relative path from the base directory
-                        rel_path = os.path.relpath(file_path, base_dir)
-                        output_file.write(f"\n<file path=\"{rel_path}\">\n")
-                        output_file.write(content)
-                        output_file.write("\n</file>\n")
-                        
-                        total_lines += content.count('\n') + 1
-                        total_tokens += estimate_tokens(content)
-                        file_count += 1
-                        
-                    except Exception as e:
-                        # Use relative path from the base directory
-                        rel_path = os.path.relpath(file_path, base_dir)
-                        output_file.write(f"\n<error file=\"{rel_path}\">{str(e)}</error>\n")
-
-        output_file.write("</file_contents>\n")
-        output_file.write("</project_overview>")
+                if error is not None:
+                    emit(f"\n<error file=\"{rel_path}\">{str(error)}</error>\n")
+                    continue
+                
+                emit(f"\n<file path=\"{rel_path}\">\n{content}\n</file>\n")
+                
+                total_lines += lines
+                total_tokens += tokens
+                file_count += 1
+
+            emit("</file_contents>\n"
+                 "</project_overview>")
+            flush()
+        finally:
+            os.close(out_fd)
 
     return file_count, total_lines, total_tokens
 